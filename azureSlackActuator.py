@@ -1,14 +1,24 @@
 # working stable actuator
 import os
-import json
+import asyncio
 import re
+import hmac
+import hashlib
+import random
+import itertools
 import aiohttp
+import orjson
 import httpx
+import openai
 import time
-from fastapi import FastAPI, Request, BackgroundTasks
+from collections import OrderedDict
+from fastapi import FastAPI, Request, Response
 from dotenv import load_dotenv
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from autogen_agentchat.agents import AssistantAgent
-from autogen_agentchat.messages import TextMessage
+from autogen_agentchat.base import TaskResult
+from autogen_agentchat.messages import TextMessage, ModelClientStreamingChunkEvent
+from autogen_core import CancellationToken
 from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
 
 # ================================================================
@@ -18,14 +28,43 @@ from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
 load_dotenv()
 
 SLACK_BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN")
+SLACK_SIGNING_SECRET = os.getenv("SLACK_SIGNING_SECRET")
+SLACK_SIGNATURE_MAX_AGE = 300
 AZURE_ENDPOINT = os.getenv("AZURE_ENDPOINT")
 AZURE_API_VERSION = os.getenv("MODEL_API_VERSION")
 AZURE_DEPLOYMENT = os.getenv("MODEL_DEPLOYMENT_NAME", "gpt-4o")
 MCP_URL = "https://alpacashit-h3edbzd5hgabh6hs.westeurope-01.azurewebsites.net/mcp"
 MCP_VERSION = "2024-11-05"
+_DEBUG = os.getenv("ACTUATOR_DEBUG") == "1"
+_DEBUG_DUMP_LIMIT = 2048
+MCP_CACHE_REFRESH_MINUTES = 10
+MCP_CACHE_REFRESH_TIMEOUT = 10
+SLACK_API_URL = "https://slack.com/api"
+SLACK_WORKERS = int(os.getenv("SLACK_WORKERS", "8"))
+SLACK_QUEUE_MAX = 1000
+# JSON-RPC ids must be unique per request: the shared MCP session routes responses by id
+_RPC_IDS = itertools.count(1)
+_PRICE_RE = re.compile(r"(Ask|Bid|Last|Price)\s*[:=]\s*(\d+(?:\.\d+)?)")
 
 app = FastAPI(title="Autonomous Azure Slack-MCP Actuator", version="3.7")
 
+# Shared Slack HTTP client (created on startup, reused by every Slack call)
+_SLACK_HTTP: httpx.AsyncClient = None
+_SCHEDULER = AsyncIOScheduler()
+_MCP_SESSION_LOCK = asyncio.Lock()
+
+# One Azure OpenAI client for the whole process so its connection pool stays warm.
+# Agents themselves are cheap but stateful (they keep message history), so they
+# are still built per call on top of this shared client.
+_AZURE_CLIENT = AzureOpenAIChatCompletionClient(
+    azure_endpoint=AZURE_ENDPOINT,
+    azure_deployment=AZURE_DEPLOYMENT,
+    api_version=AZURE_API_VERSION,
+    model="gpt-4o-2024-11-20",
+    # Retries are handled by _retry(); SDK-level retries would multiply attempts and sleeps
+    max_retries=0,
+)
+
 # ================================================================
 # 🧭 Logging Helper
 # ================================================================
@@ -37,25 +76,110 @@ def log_big(title: str):
 def log(msg: str):
     print(f"[{time.strftime('%H:%M:%S')}] {msg}", flush=True)
 
+def log_json(label: str, obj):
+    """Pretty-print obj (truncated to 2 KB) — only when ACTUATOR_DEBUG=1."""
+    if not _DEBUG:
+        return
+    dumped = orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2).decode()
+    if len(dumped) > _DEBUG_DUMP_LIMIT:
+        dumped = f"{dumped[:_DEBUG_DUMP_LIMIT]}\n… [{len(dumped) - _DEBUG_DUMP_LIMIT} more chars]"
+    log(f"{label}{dumped}")
+
+
+# ================================================================
+# 🔁 Retry Helper (exponential backoff + jitter)
+# ================================================================
+class UpstreamHTTPError(RuntimeError):
+    """Non-success HTTP reply from MCP or Slack, carrying the status and any Retry-After hint."""
+
+    def __init__(self, message: str, status: int, retry_after: float = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+def _parse_retry_after(value):
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def _retry_delay(exc: Exception, attempt: int, idempotent: bool):
+    """Seconds to wait before retrying exc, or None if it should propagate.
+
+    Non-idempotent calls only retry failures where the request cannot have been
+    acted on (429, connection refused); 5xx and timeouts are retried only when
+    repeating the call is harmless.
+    """
+    retry_after = None
+    if isinstance(exc, UpstreamHTTPError):
+        if exc.status != 429 and not (idempotent and exc.status >= 500):
+            return None
+        retry_after = exc.retry_after
+    elif isinstance(exc, openai.RateLimitError):
+        retry_after = _parse_retry_after(exc.response.headers.get("retry-after"))
+    elif isinstance(exc, (aiohttp.ClientConnectorError, httpx.ConnectError)):
+        pass
+    elif not (idempotent and isinstance(exc, (
+        asyncio.TimeoutError, httpx.TimeoutException, openai.APIConnectionError, openai.InternalServerError,
+    ))):
+        return None
+    if retry_after is not None:
+        return retry_after
+    return min(30, 0.5 * 2 ** attempt) * random.uniform(0.5, 1.5)
+
+
+async def _retry(coro_fn, max_attempts: int = 8, idempotent: bool = True):
+    """Await coro_fn(), retrying 429/5xx/connection/timeout failures with jittered backoff."""
+    for attempt in range(max_attempts):
+        try:
+            return await coro_fn()
+        except Exception as e:
+            delay = _retry_delay(e, attempt, idempotent)
+            if delay is None or attempt == max_attempts - 1:
+                raise
+            log(f"🔁 Attempt {attempt + 1}/{max_attempts} failed ({e!r}) — retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
 
 # ================================================================
 # ⚙️ MCP HTTP Client
 # ================================================================
 class MCPHTTPClient:
-    def __init__(self, base_url: str):
+    def __init__(self, base_url: str, http: aiohttp.ClientSession, session_id: str = None,
+                 recover_session: bool = True, max_attempts: int = 8):
         self.base_url = base_url
-        self.session_id = None
-        self.http = None
+        self.session_id = session_id
+        self.http = http
+        # Renew the shared session and retry once when the server no longer knows it
+        self.recover_session = recover_session
+        self.max_attempts = max_attempts
 
     async def __aenter__(self):
-        self.http = aiohttp.ClientSession()
         return self
 
     async def __aexit__(self, *args):
-        if self.http:
-            await self.http.close()
+        # The aiohttp session is process-wide and closed on app shutdown.
+        pass
 
     async def _post(self, payload: dict):
+        # tools/call may place orders, so only retry failures the server cannot have acted on
+        idempotent = payload.get("method") != "tools/call"
+        try:
+            return await _retry(lambda: self._post_once(payload), self.max_attempts, idempotent)
+        except UpstreamHTTPError as e:
+            # 404 = session reaped/server restarted; the request was not acted on, so one retry is safe
+            if e.status != 404 or not self.recover_session or not self.session_id:
+                raise
+            log(f"♻️ MCP session {self.session_id} not found — renewing and retrying {payload.get('method')}")
+            stale_session_id = self.session_id
+            self.session_id = await renew_mcp_session(stale_session_id)
+            if not self.session_id or self.session_id == stale_session_id:
+                raise
+            return await _retry(lambda: self._post_once(payload), self.max_attempts, idempotent)
+
+    async def _post_once(self, payload: dict):
         log_big(f"MCP POST → {payload.get('method', 'unknown')}")
         headers = {
             "Content-Type": "application/json",
@@ -65,25 +189,51 @@ class MCPHTTPClient:
         if self.session_id:
             headers["mcp-session-id"] = self.session_id
 
-        async with self.http.post(self.base_url, json=payload, headers=headers, timeout=45) as resp:
-            text = await resp.text()
+        async with self.http.post(self.base_url, data=orjson.dumps(payload), headers=headers) as resp:
             sid = resp.headers.get("mcp-session-id")
             if sid:
                 self.session_id = sid
             log(f"📨 MCP STATUS {resp.status}")
             if resp.status >= 400:
-                raise RuntimeError(f"MCP HTTP {resp.status}: {text[:300]}")
+                body = await resp.read()
+                raise UpstreamHTTPError(
+                    f"MCP HTTP {resp.status}: {body[:300].decode(errors='replace')}",
+                    resp.status,
+                    _parse_retry_after(resp.headers.get("Retry-After")),
+                )
+            if "text/event-stream" in resp.headers.get("Content-Type", ""):
+                return await self._read_last_sse_event(resp)
+            body = await resp.read()
             try:
-                return json.loads(text)
-            except json.JSONDecodeError:
-                lines = [json.loads(l[len('data:'):]) for l in text.splitlines() if l.startswith("data:")]
-                return lines[-1] if lines else text
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                return body.decode(errors="replace")
+
+    @staticmethod
+    async def _read_last_sse_event(resp: aiohttp.ClientResponse):
+        """Read an SSE body chunk by chunk, keeping only the last `data:` payload and parsing it once at EOF."""
+        # Split lines ourselves: readline() rejects lines above aiohttp's buffer limit,
+        # and a large tools/list or bars result arrives as a single data: line.
+        pending = bytearray()
+        last = None
+        async for chunk in resp.content.iter_any():
+            pending += chunk
+            if b"\n" not in chunk:
+                continue
+            *lines, rest = pending.split(b"\n")
+            pending = rest
+            for line in lines:
+                if line.startswith(b"data:"):
+                    last = line
+        if pending.startswith(b"data:"):
+            last = pending
+        return orjson.loads(memoryview(last)[5:]) if last else ""
 
     async def initialize(self):
         log_big("MCP INITIALIZE")
         payload = {
             "jsonrpc": "2.0",
-            "id": 1,
+            "id": next(_RPC_IDS),
             "method": "initialize",
             "params": {
                 "protocolVersion": MCP_VERSION,
@@ -95,44 +245,82 @@ class MCPHTTPClient:
 
     async def list_tools(self):
         log_big("MCP LIST TOOLS")
-        payload = {"jsonrpc": "2.0", "id": 2, "method": "tools/list", "params": {}}
+        payload = {"jsonrpc": "2.0", "id": next(_RPC_IDS), "method": "tools/list", "params": {}}
         result = await self._post(payload)
         tools = result.get("result", {}).get("tools", [])
         log(f"🧰 TOOLS FOUND: {[t['name'] for t in tools]}")
         return tools
 
+    async def open_session(self):
+        """Initialize the MCP session and list its tools (tools/list needs the session id)."""
+        await self.initialize()
+        return await self.list_tools()
+
     async def call_tool(self, tool_name: str, args: dict):
         log_big(f"MCP CALL TOOL → {tool_name}")
         payload = {
             "jsonrpc": "2.0",
-            "id": 3,
+            "id": next(_RPC_IDS),
             "method": "tools/call",
             "params": {"name": tool_name, "arguments": args},
         }
-        log(f"📦 ARGS: {json.dumps(args, indent=2)}")
+        log_json("📦 ARGS: ", args)
         result = await self._post(payload)
         log(f"✅ MCP RESPONSE RECEIVED for {tool_name}")
         return result
 
 
+def _as_text(value) -> str:
+    if isinstance(value, str):
+        return value
+    return "" if value is None else orjson.dumps(value, default=str).decode()
+
+
+def _mcp_text(result) -> str:
+    """Readable payload of a tools/call result as a string: structuredContent.result, else content[0].text."""
+    # _post returns raw text for non-JSON bodies and "" for an SSE stream without data
+    if not isinstance(result, dict):
+        return _as_text(result)
+    r = result.get("result") or {}
+    sc = r.get("structuredContent")
+    if isinstance(sc, dict) and sc.get("result"):
+        return _as_text(sc["result"])
+    c = r.get("content")
+    return _as_text(c[0].get("text")) if c and isinstance(c[0], dict) else ""
+
+
 # ================================================================
 # 💹 Stock Price Fetch via MCP
 # ================================================================
-async def get_stock_price(symbol: str) -> float:
-    """Fetch current stock price via MCP get_stock_quote."""
+def _structured_price(result: dict):
+    """Numeric price from structuredContent (bare number or a dict with `price`), else None."""
+    if not isinstance(result, dict):
+        return None
+    sc = (result.get("result") or {}).get("structuredContent")
+    quote = sc.get("result", sc) if isinstance(sc, dict) else sc
+    if isinstance(quote, dict):
+        quote = quote.get("price")
+    if isinstance(quote, (int, float)) and not isinstance(quote, bool):
+        return float(quote)
+    return None
+
+
+async def get_stock_price(symbol: str, mcp: MCPHTTPClient) -> float:
+    """Fetch current stock price via MCP get_stock_quote on an already-initialized session."""
     log_big(f"FETCH STOCK PRICE FOR {symbol}")
     try:
-        async with MCPHTTPClient(MCP_URL) as mcp:
-            await mcp.initialize()
-            result = await mcp.call_tool("get_stock_quote", {"symbol": symbol})
-            text = json.dumps(result)
-            match = re.search(r"(Ask|Bid|Last|Price)\s*[:=]\s*(\d+(\.\d+)?)", text)
-            if match:
-                price = float(match.group(2))
-                log(f"💰 Parsed {symbol} price ≈ ${price}")
-                return price
-            log(f"⚠️ No numeric price found in MCP quote response for {symbol}.")
-            return 0.0
+        result = await mcp.call_tool("get_stock_quote", {"symbol": symbol})
+        price = _structured_price(result)
+        if price is not None:
+            log(f"💰 Structured {symbol} price = ${price}")
+            return price
+        match = _PRICE_RE.search(_mcp_text(result))
+        if match:
+            price = float(match.group(2))
+            log(f"💰 Parsed {symbol} price ≈ ${price}")
+            return price
+        log(f"⚠️ No numeric price found in MCP quote response for {symbol}.")
+        return 0.0
     except Exception as e:
         log(f"❌ get_stock_price() failed: {e}")
         return 0.0
@@ -141,6 +329,18 @@ async def get_stock_price(symbol: str) -> float:
 # ================================================================
 # 📣 Slack Response Utilities
 # ================================================================
+async def _slack_call(method: str, path: str, **kwargs) -> httpx.Response:
+    """Single Slack Web API request; raises UpstreamHTTPError on 429/5xx so _retry can back off."""
+    resp = await _SLACK_HTTP.request(method, path, **kwargs)
+    if resp.status_code == 429 or resp.status_code >= 500:
+        raise UpstreamHTTPError(
+            f"Slack HTTP {resp.status_code} on {path}",
+            resp.status_code,
+            _parse_retry_after(resp.headers.get("Retry-After")),
+        )
+    return resp
+
+
 async def post_to_slack(channel: str, text: str, thread_ts: str = None):
     """Post a message to Slack (optionally in a thread)."""
     try:
@@ -151,13 +351,16 @@ async def post_to_slack(channel: str, text: str, thread_ts: str = None):
         payload = {"channel": channel, "text": text}
         if thread_ts:
             payload["thread_ts"] = thread_ts
-        async with httpx.AsyncClient() as client:
-            resp = await client.post("https://slack.com/api/chat.postMessage", json=payload, headers=headers)
-            data = resp.json()
-            if not data.get("ok"):
-                log(f"⚠️ Slack API error: {data}")
-            else:
-                log(f"✅ Posted to Slack: {text[:80]}...")
+        # Slack may already have posted on a 5xx/timeout, so only retry failures it cannot have acted on
+        resp = await _retry(
+            lambda: _slack_call("POST", "/chat.postMessage", content=orjson.dumps(payload), headers=headers),
+            idempotent=False,
+        )
+        data = orjson.loads(resp.content)
+        if not data.get("ok"):
+            log(f"⚠️ Slack API error: {data}")
+        else:
+            log(f"✅ Posted to Slack: {text[:80]}...")
     except Exception as e:
         log(f"❌ post_to_slack() failed: {e}")
 
@@ -167,39 +370,35 @@ async def post_to_slack(channel: str, text: str, thread_ts: str = None):
 # ================================================================
 async def generate_gpt_reply(context: str) -> str:
     """Use GPT to generate a friendly conversational Slack reply."""
-    model_client = AzureOpenAIChatCompletionClient(
-        azure_endpoint=AZURE_ENDPOINT,
-        azure_deployment=AZURE_DEPLOYMENT,
-        api_version=AZURE_API_VERSION,
-        model="gpt-4o-2024-11-20",
-    )
     system_message = (
         "You are a friendly financial assistant replying to a Slack user. "
         "Summarize what just happened in a short, natural, friendly way, with emojis if appropriate."
     )
-    agent = AssistantAgent(
-        name="SlackFriendlyResponder",
-        model_client=model_client,
-        system_message=system_message,
-    )
-    user_msg = TextMessage(content=context, source="user")
-    result = await agent.run(task=user_msg)
+
+    async def _run():
+        agent = AssistantAgent(
+            name="SlackFriendlyResponder",
+            model_client=_AZURE_CLIENT,
+            system_message=system_message,
+        )
+        return await agent.run(task=TextMessage(content=context, source="user"))
+
+    result = await _retry(_run)
     if hasattr(result, "messages") and result.messages:
         return result.messages[-1].content
     return "✅ Trade executed successfully!"
 
 
 # ================================================================
-# 🧠 GPT Reasoning — via AssistantAgent
+# 🗂️ MCP Tool Cache (startup + periodic refresh)
 # ================================================================
-async def analyze_intent_with_gpt(message: str, mcp_tools: list):
-    log_big("GPT INTENT ANALYSIS — VIA ASSISTANT AGENT")
+def render_decision_prompt(mcp_tools: list) -> str:
+    """Build the decision agent's system message from the MCP tool list."""
     tools_summary = "\n".join(
         [f"• {t['name']} —\n    {t.get('description', '').strip()}\n\n  Args: {t.get('inputSchema', {}).get('properties', {})}"
          for t in mcp_tools]
     )
-
-    system_message = f"""
+    return f"""
 You are a financial trading assistant connected to an Alpaca MCP trading server.
 You can handle both **queries** (like balance, positions) and **actions** (buy, sell, close).
 Select exactly one MCP tool that fits the user’s intent.
@@ -215,27 +414,135 @@ Rules:
 {tools_summary}
 """
 
-    model_client = AzureOpenAIChatCompletionClient(
-        azure_endpoint=AZURE_ENDPOINT,
-        azure_deployment=AZURE_DEPLOYMENT,
-        api_version=AZURE_API_VERSION,
-        model="gpt-4o-2024-11-20",
-    )
+
+async def _load_mcp_cache(reinitialize: bool = False):
+    """Re-list tools on the cached MCP session, opening a new session only if there is none or it is invalid."""
+    # Single attempt per call: callers are bounded by MCP_CACHE_REFRESH_TIMEOUT, not by backoff
+    async with MCPHTTPClient(MCP_URL, app.state.http, recover_session=False, max_attempts=1) as mcp:
+        tools = None
+        if app.state.mcp_session_id and not reinitialize:
+            mcp.session_id = app.state.mcp_session_id
+            try:
+                tools = await mcp.list_tools()
+            except UpstreamHTTPError as e:
+                if e.status != 404:
+                    raise
+                log(f"♻️ Cached MCP session {mcp.session_id} expired — opening a new one")
+                mcp.session_id = None
+        if tools is None:
+            tools = await mcp.open_session()
+    return mcp.session_id, tools
+
+
+async def refresh_mcp_cache(reinitialize: bool = False, stale_session_id: str = None):
+    """Cache the MCP session id, tool list and decision prompt on app.state.
+
+    With stale_session_id, skip the work if another caller already replaced that session.
+    """
+    log_big("REFRESH MCP TOOL CACHE")
+    try:
+        async with _MCP_SESSION_LOCK:
+            if stale_session_id and app.state.mcp_session_id != stale_session_id:
+                return
+            session_id, tools = await asyncio.wait_for(_load_mcp_cache(reinitialize), MCP_CACHE_REFRESH_TIMEOUT)
+            app.state.mcp_session_id = session_id
+            app.state.mcp_tools = tools
+            app.state.system_message = render_decision_prompt(tools)
+        log(f"🗂️ Cached {len(tools)} MCP tools (session={session_id})")
+    except Exception as e:
+        log(f"❌ refresh_mcp_cache() failed: {e!r}")
+
+
+async def renew_mcp_session(stale_session_id: str):
+    """Replace a session the server rejected (404); concurrent callers share one renewal."""
+    await refresh_mcp_cache(reinitialize=True, stale_session_id=stale_session_id)
+    return app.state.mcp_session_id
+
+
+# ================================================================
+# 🧠 GPT Reasoning — via AssistantAgent
+# ================================================================
+class _JSONSpanScanner:
+    """Incremental, string/escape-aware scanner for the first balanced top-level {...} object."""
+
+    def __init__(self):
+        self.text = ""
+        self.pos = 0
+        self.start = -1
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+
+    def feed(self, chunk: str):
+        """Append chunk and resume scanning; return the object span as soon as it closes, else None."""
+        self.text += chunk
+        text = self.text
+        start, depth, in_string, escape = self.start, self.depth, self.in_string, self.escape
+        for i in range(self.pos, len(text)):
+            ch = text[i]
+            if start < 0:
+                if ch == "{":
+                    start, depth = i, 1
+            elif in_string:
+                if escape:
+                    escape = False
+                elif ch == "\\":
+                    escape = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == '"':
+                in_string = True
+            elif ch == "{":
+                depth += 1
+            elif ch == "}":
+                depth -= 1
+                if depth == 0:
+                    self.pos, self.start, self.depth = i + 1, -1, 0
+                    return text[start:i + 1]
+        self.pos = len(text)
+        self.start, self.depth, self.in_string, self.escape = start, depth, in_string, escape
+        return None
+
+
+def _extract_first_json(s: str):
+    """Return the first balanced top-level {...} span in s, or None."""
+    return _JSONSpanScanner().feed(s)
+
+
+async def _stream_decision(message: str, system_message: str):
+    """Stream the decision agent's reply and stop generation as soon as its JSON object closes."""
     decision_agent = AssistantAgent(
         name="SlackDecisionAgent",
-        model_client=model_client,
+        model_client=_AZURE_CLIENT,
         system_message=system_message,
+        model_client_stream=True,
     )
     user_input = TextMessage(content=message, source="user")
-
+    scanner = _JSONSpanScanner()
+    cancellation = CancellationToken()
+    stream = decision_agent.run_stream(task=user_input, cancellation_token=cancellation)
+    try:
+        async for event in stream:
+            if isinstance(event, ModelClientStreamingChunkEvent):
+                span = scanner.feed(event.content)
+                if span:
+                    log("⚡ Decision JSON closed — cancelling rest of GPT stream")
+                    return span
+            elif isinstance(event, TaskResult) and event.messages:
+                return _extract_first_json(str(event.messages[-1].content))
+        return None
+    finally:
+        cancellation.cancel()
+        await stream.aclose()
+
+
+async def analyze_intent_with_gpt(message: str, system_message: str):
+    log_big("GPT INTENT ANALYSIS — VIA ASSISTANT AGENT")
     try:
-        result = await decision_agent.run(task=user_input)
-        final_msg = result.messages[-1].content if hasattr(result, "messages") and result.messages else str(result)
-        json_start = final_msg.find("{")
-        json_end = final_msg.rfind("}")
-        if json_start >= 0 and json_end >= 0:
-            parsed = json.loads(final_msg[json_start:json_end + 1])
-            log(f"✅ Parsed JSON decision: {json.dumps(parsed, indent=2)}")
+        span = await _retry(lambda: _stream_decision(message, system_message))
+        if span:
+            parsed = orjson.loads(span)
+            log_json("✅ Parsed JSON decision: ", parsed)
             return parsed
         return {"tool": "none", "args": {}}
     except Exception as e:
@@ -250,29 +557,73 @@ async def fetch_parent_message(channel: str, thread_ts: str):
     log_big("FETCH PARENT MESSAGE")
     headers = {"Authorization": f"Bearer {SLACK_BOT_TOKEN}"}
     params = {"channel": channel, "ts": thread_ts, "limit": 1}
-    async with httpx.AsyncClient() as client:
-        r = await client.get("https://slack.com/api/conversations.replies", params=params, headers=headers)
-        data = r.json()
-        if data.get("ok") and data.get("messages"):
-            parent = data["messages"][0].get("text", "")
-            log(f"🪶 PARENT MESSAGE: {parent[:120]}...")
-            return parent
-        log("⚠️ Failed to fetch parent message.")
-        return ""
+    r = await _retry(lambda: _slack_call("GET", "/conversations.replies", params=params, headers=headers))
+    data = orjson.loads(r.content)
+    if data.get("ok") and data.get("messages"):
+        parent = data["messages"][0].get("text", "")
+        log(f"🪶 PARENT MESSAGE: {parent[:120]}...")
+        return parent
+    log("⚠️ Failed to fetch parent message.")
+    return ""
 
 
 # ================================================================
 # 🚀 Slack Event Webhook (loop-safe)
 # ================================================================
+_SEEN_EVENTS = OrderedDict()
+_SEEN_EVENTS_MAX = 10_000
+
+
+def _is_duplicate_event(event_id: str) -> bool:
+    """Record event_id in a bounded LRU; True if this worker has already accepted it."""
+    if event_id in _SEEN_EVENTS:
+        _SEEN_EVENTS.move_to_end(event_id)
+        return True
+    _SEEN_EVENTS[event_id] = None
+    if len(_SEEN_EVENTS) > _SEEN_EVENTS_MAX:
+        _SEEN_EVENTS.popitem(last=False)
+    return False
+
+
+def _verify_slack_signature(headers, raw_body: bytes) -> bool:
+    """Check Slack's v0 HMAC-SHA256 request signature and reject stale timestamps (replay guard)."""
+    ts = headers.get("X-Slack-Request-Timestamp", "")
+    signature = headers.get("X-Slack-Signature", "")
+    # Headers arrive latin-1 decoded: '²'.isdigit() is True but int('²') fails, so require ASCII
+    if not (ts.isascii() and ts.isdigit()) or abs(time.time() - int(ts)) > SLACK_SIGNATURE_MAX_AGE:
+        return False
+    expected = b"v0=" + hmac.new(
+        SLACK_SIGNING_SECRET.encode(), b"v0:" + ts.encode() + b":" + raw_body, hashlib.sha256
+    ).hexdigest().encode()
+    # Compare bytes: compare_digest(str, str) raises TypeError on non-ASCII input
+    return hmac.compare_digest(expected, signature.encode())
+
+
 @app.post("/slack/events")
-async def slack_events(request: Request, background_tasks: BackgroundTasks):
+async def slack_events(request: Request):
     log_big("INCOMING SLACK EVENT")
-    body = await request.json()
-    log(json.dumps(body, indent=2))
+    # Slack redelivers when we miss its 3s window; the original is already being processed
+    retry_num = request.headers.get("X-Slack-Retry-Num")
+    if retry_num:
+        log(f"🔁 Acking Slack retry #{retry_num} ({request.headers.get('X-Slack-Retry-Reason')}) without reprocessing")
+        return Response(status_code=200)
+
+    raw_body = await request.body()
+    if SLACK_SIGNING_SECRET and not _verify_slack_signature(request.headers, raw_body):
+        log("🚫 Rejected request with missing/invalid Slack signature.")
+        return Response(status_code=401)
+
+    body = orjson.loads(raw_body)
+    log_json("", body)
 
     if body.get("type") == "url_verification":
         return {"challenge": body.get("challenge")}
 
+    event_id = body.get("event_id")
+    if event_id and _is_duplicate_event(event_id):
+        log(f"🔁 Duplicate Slack event {event_id} ignored.")
+        return {"ok": True}
+
     event = body.get("event", {})
     if not event:
         log("⚠️ No event found in payload.")
@@ -288,13 +639,15 @@ async def slack_events(request: Request, background_tasks: BackgroundTasks):
         return {"ok": True}
 
     log(f"✅ Proceeding with user message from {event_user}")
-    background_tasks.add_task(
-        process_slack_reply,
-        event_user,
-        event.get("text"),
-        event.get("channel"),
-        event.get("thread_ts") or event.get("ts"),
-    )
+    try:
+        app.state.queue.put_nowait((
+            event_user,
+            event.get("text"),
+            event.get("channel"),
+            event.get("thread_ts") or event.get("ts"),
+        ))
+    except asyncio.QueueFull:
+        log(f"❌ Work queue full ({SLACK_QUEUE_MAX}) — dropping event from {event_user}")
     return {"ok": True}
 
 
@@ -303,14 +656,17 @@ async def slack_events(request: Request, background_tasks: BackgroundTasks):
 # ================================================================
 async def process_slack_reply(user, reply_text, channel, thread_ts):
     log_big("PROCESSING SLACK REPLY EVENT")
-    parent_text = await fetch_parent_message(channel, thread_ts)
+    if app.state.mcp_tools:
+        parent_text = await fetch_parent_message(channel, thread_ts)
+    else:
+        # Startup cache is cold (MCP was unreachable) — fill it alongside the Slack fetch
+        parent_text, _ = await asyncio.gather(fetch_parent_message(channel, thread_ts), refresh_mcp_cache())
     full_message = f"Parent: {parent_text}\nUser reply: {reply_text}"
 
-    async with MCPHTTPClient(MCP_URL) as mcp:
-        await mcp.initialize()
-        tools = await mcp.list_tools()
-        decision = await analyze_intent_with_gpt(full_message, tools)
-        log(f"🎯 GPT DECISION: {json.dumps(decision, indent=2)}")
+    async with MCPHTTPClient(MCP_URL, app.state.http, session_id=app.state.mcp_session_id) as mcp:
+        decision = await analyze_intent_with_gpt(full_message, app.state.system_message)
+        log(f"🎯 GPT DECISION: {decision.get('tool')}")
+        log_json("🎯 GPT DECISION ARGS: ", decision.get("args", {}))
 
         tool = decision.get("tool")
         args = decision.get("args", {})
@@ -319,7 +675,7 @@ async def process_slack_reply(user, reply_text, channel, thread_ts):
             symbol = args.get("symbol")
             notional = args.get("notional")
             if notional and symbol:
-                price = await get_stock_price(symbol)
+                price = await get_stock_price(symbol, mcp)
                 args["quantity"] = round(notional / price, 3) if price > 0 else 1.0
             args.pop("notional", None)
             if not args.get("quantity"):
@@ -328,18 +684,10 @@ async def process_slack_reply(user, reply_text, channel, thread_ts):
         if tool and tool.lower() != "none":
             log_big(f"EXECUTING MCP TOOL → {tool}")
             result = await mcp.call_tool(tool, args)
-            log(f"📈 MCP RESULT: {json.dumps(result, indent=2)}")
+            log_json("📈 MCP RESULT: ", result)
 
             # 🧠 Extract readable content from MCP response
-            mcp_text = ""
-            try:
-                mcp_text = result.get("result", {}).get("structuredContent", {}).get("result", "")
-                if not mcp_text:
-                    contents = result.get("result", {}).get("content", [])
-                    if contents and isinstance(contents, list):
-                        mcp_text = contents[0].get("text", "")
-            except Exception as e:
-                log(f"⚠️ Failed to parse MCP result text: {e}")
+            mcp_text = _mcp_text(result)
 
             # 📝 Compose readable summary
             summary = (
@@ -347,15 +695,101 @@ async def process_slack_reply(user, reply_text, channel, thread_ts):
                 f"📊 *Result:*\n```\n{mcp_text.strip()[:1500]}\n```"
             )
 
-            # 💬 Friendly GPT wrap-up
-            friendly = await generate_gpt_reply(summary)
-            final_msg = f"{summary}\n\n{friendly}"
-
-            await post_to_slack(channel, final_msg, thread_ts)
+            # 📣 Post the raw result right away; the friendly GPT wrap-up follows in-thread
+            _, friendly = await asyncio.gather(
+                post_to_slack(channel, summary, thread_ts),
+                generate_gpt_reply(summary),
+            )
+            await post_to_slack(channel, friendly, thread_ts)
         else:
             await post_to_slack(channel, "🤔 No actionable command detected.", thread_ts)
 
 
+# ================================================================
+# 👷 Bounded Worker Pool
+# ================================================================
+async def _worker(queue: asyncio.Queue):
+    """Drain queued Slack events one at a time; SLACK_WORKERS of these cap upstream concurrency."""
+    while True:
+        item = await queue.get()
+        try:
+            await process_slack_reply(*item)
+        except Exception as e:
+            log(f"❌ process_slack_reply() failed: {e}")
+        finally:
+            queue.task_done()
+
+
+# ================================================================
+# 🔌 Shared Connection Pools (startup / shutdown)
+# ================================================================
+async def warm_slack_pool():
+    """Open a keep-alive connection to Slack with a cheap auth.test call."""
+    try:
+        r = await _SLACK_HTTP.post("/auth.test", headers={"Authorization": f"Bearer {SLACK_BOT_TOKEN}"})
+        log(f"🔥 Slack pool warm (auth ok={orjson.loads(r.content).get('ok')})")
+    except Exception as e:
+        log(f"⚠️ warm_slack_pool() failed: {e}")
+
+
+async def _warm_up():
+    await asyncio.gather(refresh_mcp_cache(), warm_slack_pool())
+
+
+@app.on_event("startup")
+async def startup():
+    global _SLACK_HTTP
+    log_big("STARTUP — OPENING SHARED HTTP POOLS")
+    if not SLACK_SIGNING_SECRET:
+        log("⚠️ SLACK_SIGNING_SECRET not set — Slack request signatures will NOT be verified.")
+    app.state.http = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit=512,
+            limit_per_host=128,
+            enable_cleanup_closed=True,
+            keepalive_timeout=60,
+            resolver=aiohttp.AsyncResolver(),
+            ttl_dns_cache=3600,
+            use_dns_cache=True,
+        ),
+        timeout=aiohttp.ClientTimeout(total=45, connect=5, sock_read=30),
+    )
+    _SLACK_HTTP = httpx.AsyncClient(
+        base_url=SLACK_API_URL,
+        timeout=15.0,
+        # Retries are handled by _retry(); limits must live on the transport once one is supplied
+        transport=httpx.AsyncHTTPTransport(
+            retries=0,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=60),
+        ),
+    )
+
+    app.state.mcp_session_id = None
+    app.state.mcp_tools = []
+    app.state.system_message = render_decision_prompt([])
+    # Warm both pools (DNS + TLS) in the background so an unreachable MCP host cannot stall
+    # startup (and the url_verification handshake) past gunicorn's worker timeout
+    app.state.warmup = asyncio.create_task(_warm_up())
+    _SCHEDULER.add_job(refresh_mcp_cache, "interval", minutes=MCP_CACHE_REFRESH_MINUTES)
+    _SCHEDULER.start()
+
+    app.state.queue = asyncio.Queue(maxsize=SLACK_QUEUE_MAX)
+    app.state.workers = [asyncio.create_task(_worker(app.state.queue)) for _ in range(SLACK_WORKERS)]
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    log_big("SHUTDOWN — CLOSING SHARED HTTP POOLS")
+    _SCHEDULER.shutdown(wait=False)
+    app.state.warmup.cancel()
+    for w in app.state.workers:
+        w.cancel()
+    await asyncio.gather(*app.state.workers, return_exceptions=True)
+    await app.state.http.close()
+    await _SLACK_HTTP.aclose()
+    await _AZURE_CLIENT.close()
+
+
 # ================================================================
 # 🩺 Health Check
 # ================================================================